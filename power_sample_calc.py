@@ -5,8 +5,8 @@ import streamlit as st
 import numpy as np
 import math
 import pandas as pd
-from scipy.stats import norm
-from typing import Optional, Dict, List, Any
+from scipy.special import ndtr, ndtri
+from typing import Optional, Dict, List, Any, Union
 from statsmodels.stats.power import TTestIndPower, TTestPower, FTestAnovaPower
 
 # ==============================================================================
@@ -20,6 +20,10 @@ from statsmodels.stats.power import TTestIndPower, TTestPower, FTestAnovaPower
 # ARE ≈ 3/π ≈ 0.9549 for rank-based tests under normality assumption.
 # Reference: Lehmann, E. L. (1998). Nonparametrics: Statistical Methods Based on Ranks
 ARE_FACTORS = {"wilcoxon": 0.955, "mann_whitney": 0.955, "kruskal_wallis": 0.955}
+# Snapshot of ARE_FACTORS (wilcoxon, mann_whitney, kruskal_wallis) copied into a read-only array
+# at import for vectorized checks. It does not track later changes to ARE_FACTORS; update both together.
+ARE_FACTORS_ARRAY = np.array([ARE_FACTORS[k] for k in ("wilcoxon", "mann_whitney", "kruskal_wallis")])
+ARE_FACTORS_ARRAY.flags.writeable = False
 
 # Fisher's Exact Test adjustments
 # These factors account for the conservativeness of Fisher's Exact Test (uses discrete distribution)
@@ -45,6 +49,9 @@ MIN_VARIANCE_THRESHOLD = 0.11
 # Higher values increase accuracy but add computational time. 10,000 is a reasonable balance.
 MONTE_CARLO_SAMPLES = 10000
 
+# Integer codes for the alternative hypothesis, used by the vectorized calculators
+ALTERNATIVE_CODES = {"two-sided": 0, "larger": 1, "smaller": 2}
+
 # Practical guidance constants
 RECRUITMENT_FEASIBILITY_THRESHOLDS = {
     "easy": 100,
@@ -217,12 +224,75 @@ def calculate_effect_size(effect_type: str, **kwargs) -> Optional[float]:
         elif effect_type == "cohen_h":
             p1, p2 = kwargs.get('p1'), kwargs.get('p2')
             if all(v is not None for v in [p1, p2]) and 0 < p1 < 1 and 0 < p2 < 1 and p1 != p2:
-                return abs(2 * np.arcsin(np.sqrt(p1)) - 2 * np.arcsin(np.sqrt(p2)))
+                return abs(2 * math.asin(math.sqrt(p1)) - 2 * math.asin(math.sqrt(p2)))
     except Exception as e:
         st.error(f"Error calculating effect size: {e}")
     return None
 
 
+def calculate_effect_size_batch(effect_type: str, **kwargs) -> np.ndarray:
+    """
+    Vectorized counterpart of calculate_effect_size() for arrays of raw values.
+
+    Takes the same effect types and keyword names as calculate_effect_size(), but each
+    value may be a scalar or array-like. Inputs are broadcast and the effect size is
+    computed in one NumPy expression. Lanes that calculate_effect_size() would reject
+    (SD ≤ 0, proportions outside (0, 1), equal proportions) are NaN instead of None.
+
+    Returns:
+    --------
+    np.ndarray : Effect sizes (absolute values) with the broadcast shape of the inputs
+
+    Raises:
+    -------
+    ValueError : If effect_type is unknown or a required value is missing
+
+    Examples:
+    ---------
+    >>> calculate_effect_size_batch("cohen_d_two", mean1=[105, 120], mean2=[100, 100], pooled_sd=[10, 15])
+    array([0.5       , 1.33333333])
+    """
+    required = {
+        "cohen_d_two": ("mean1", "mean2", "pooled_sd"),
+        "cohen_d_one": ("sample_mean", "hypothesized_mean", "sd"),
+        "cohen_d_paired": ("mean_diff", "sd_diff"),
+        "cohen_h": ("p1", "p2"),
+    }
+    if effect_type not in required:
+        raise ValueError(f"Unknown effect type: {effect_type}")
+    missing = [name for name in required[effect_type] if kwargs.get(name) is None]
+    if missing:
+        raise ValueError(f"Missing values for {effect_type}: {', '.join(missing)}")
+    args = [np.asarray(kwargs[name], dtype=float) for name in required[effect_type]]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if effect_type == "cohen_h":
+            p1, p2 = args
+            valid = (0 < p1) & (p1 < 1) & (0 < p2) & (p2 < 1) & (p1 != p2)
+            h = np.abs(2 * np.arcsin(np.sqrt(p1)) - 2 * np.arcsin(np.sqrt(p2)))
+            return np.where(valid, h, np.nan)
+
+        if effect_type == "cohen_d_paired":
+            mean_diff, sd = args
+            diff = np.abs(mean_diff)
+        else:
+            first, second, sd = args
+            diff = np.abs(first - second)
+        return np.where(sd > 0, diff / sd, np.nan)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _solve_power_cached(power_class: type, items: tuple) -> float:
+    """
+    Cached solve_power() on a new `power_class` instance.
+
+    `items` is the sorted tuple of solve_power keyword arguments. st.cache_data keeps
+    results across Streamlit reruns, so changing an unrelated widget does not repeat an
+    identical solve (an iterative root search for N or effect size).
+    """
+    return float(power_class().solve_power(**dict(items)))
+
+
 def display_explanation(header: str, content: str, citation_key: Optional[str] = None,
                         help_text: Optional[str] = None, expanded: bool = False) -> None:
     """Display expandable explanations with citations."""
@@ -424,9 +494,9 @@ def generate_sample_size_justification(config: Dict, inputs: Dict, result: float
     if goal != "Sample Size":
         return ""
 
-    n1 = int(np.ceil(result))
+    n1 = int(math.ceil(result))
     n_ratio = inputs.get("n_ratio", 1.0)
-    n2 = int(np.ceil(n1 * n_ratio)) if config.get("n_ratio") else None
+    n2 = int(math.ceil(n1 * n_ratio)) if config.get("n_ratio") else None
     k = inputs.get("k_groups", 1 if not n2 else 2)
     total = n1 * k if not n2 else n1 + n2
 
@@ -467,8 +537,8 @@ The sample size calculation for this {objective.lower()} study using a **{test_n
         if dropout >= 100:
             text += f"\n**⚠️ WARNING: Dropout rate of {dropout}% is invalid (must be < 100%)**\n"
         else:
-            n1_adj = int(np.ceil(n1 / (1 - dropout / 100)))
-            total_adj = n1_adj * k if not n2 else n1_adj + int(np.ceil(n1_adj * n_ratio))
+            n1_adj = int(math.ceil(n1 / (1 - dropout / 100)))
+            total_adj = n1_adj * k if not n2 else n1_adj + int(math.ceil(n1_adj * n_ratio))
             text += f"\n**Adjusted for {dropout}% expected dropout:**\n"
             text += f"- **Total recruitment target: {total_adj} participants**\n"
 
@@ -527,6 +597,14 @@ def _interpret_clinical_significance(effect_size: float, effect_type: str) -> st
 # ==============================================================================
 #                   CLUSTER-RANDOMIZED TRIAL FUNCTIONS
 # ==============================================================================
+def _validate_cluster_design(icc: float, cluster_size: float) -> None:
+    """Raise ValueError for an ICC outside [0, 1] or a cluster size below 2."""
+    if icc < 0 or icc > 1:
+        raise ValueError("ICC must be between 0 and 1")
+    if cluster_size < 2:
+        raise ValueError("Cluster size must be at least 2 (a cluster with only 1 participant is not meaningful)")
+
+
 def calculate_design_effect(icc: float, cluster_size: float) -> float:
     """
     Calculate design effect for cluster-randomized trials.
@@ -545,11 +623,7 @@ def calculate_design_effect(icc: float, cluster_size: float) -> float:
     --------
     float : Design effect (≥ 1)
     """
-    if icc < 0 or icc > 1:
-        raise ValueError("ICC must be between 0 and 1")
-    if cluster_size < 2:
-        raise ValueError("Cluster size must be at least 2 (a cluster with only 1 participant is not meaningful)")
-
+    _validate_cluster_design(icc, cluster_size)
     return 1 + (cluster_size - 1) * icc
 
 
@@ -594,9 +668,28 @@ def interpret_icc(icc: float) -> str:
 # ==============================================================================
 #                   REPEATED MEASURES ANOVA FUNCTIONS
 # ==============================================================================
+def _repeated_measures_correlation_rules(correlation) -> List[tuple]:
+    """
+    Correlation rules for calculate_repeated_measures_power(), shared by its scalar and
+    array paths.
+
+    Returns (invalid, message) pairs in reporting order, where `invalid` is a boolean
+    broadcast against `correlation`. Scalar inputs report the first violated rule;
+    array inputs set every lane that violates any rule to NaN.
+    """
+    correlation = np.asarray(correlation, dtype=float)
+    return [
+        ((correlation < 0) | (correlation > 1), "Correlation must be between 0 and 1"),
+        # Extreme correlations are outside what the approximation can handle
+        (correlation >= 0.95,
+         "❌ Correlation ≥ 0.95 is too high for this approximation. Results may be invalid. "
+         "Please use specialized repeated measures software (G*Power, PANGEA) or consult a statistician."),
+    ]
+
+
 def calculate_repeated_measures_power(n: int, effect_size: float, alpha: float,
-                                     num_measurements: int, correlation: float,
-                                     alternative: str = "two-sided") -> Optional[float]:
+                                     num_measurements: int, correlation: Union[float, np.ndarray],
+                                     alternative: str = "two-sided") -> Optional[Union[float, np.ndarray]]:
     """
     Calculate power for repeated measures ANOVA (within-subjects design).
 
@@ -627,7 +720,7 @@ def calculate_repeated_measures_power(n: int, effect_size: float, alpha: float,
         Significance level
     num_measurements : int
         Number of repeated measurements/time points
-    correlation : float
+    correlation : float or array-like
         Average correlation between repeated measurements (0 to 1)
     alternative : str
         'two-sided' or 'one-sided'
@@ -635,24 +728,24 @@ def calculate_repeated_measures_power(n: int, effect_size: float, alpha: float,
     Returns:
     --------
     float : Statistical power (0 to 1), or None if calculation fails
+    np.ndarray : If correlation is an array; one power per correlation, evaluated in a
+                 single pass, with NaN where the correlation is outside [0, 0.95)
     """
+    if np.ndim(correlation) > 0:
+        return _repeated_measures_power_array(n, effect_size, alpha, num_measurements, correlation)
+
     try:
         # Input validation
-        if correlation < 0 or correlation > 1:
-            st.error("Correlation must be between 0 and 1")
-            return None
+        for invalid, message in _repeated_measures_correlation_rules(correlation):
+            if invalid:
+                st.error(message)
+                return None
 
         # Warn about high correlations that may produce unreliable results
         if correlation >= 0.90:
             st.warning(f"⚠️ Very high correlation ({correlation:.2f}) may produce unreliable results. "
                       "Consider using specialized software for exact calculations.")
 
-        # Warn about extreme correlations
-        if correlation >= 0.95:
-            st.error("❌ Correlation ≥ 0.95 is too high for this approximation. Results may be invalid. "
-                     "Please use specialized repeated measures software (G*Power, PANGEA) or consult a statistician.")
-            return None
-
         # Use ANOVA power calculator with adjusted parameters
         power_calc = FTestAnovaPower()
 
@@ -661,7 +754,7 @@ def calculate_repeated_measures_power(n: int, effect_size: float, alpha: float,
         # Approximation: effective_f ≈ f / sqrt(1 - ρ)
         # Cap correlation effect to prevent numerical instability
         correlation_capped = min(correlation, CORRELATION_STABILITY_CAP)
-        effective_f = effect_size / np.sqrt(max(1 - correlation_capped, MIN_VARIANCE_THRESHOLD))
+        effective_f = effect_size / math.sqrt(max(1 - correlation_capped, MIN_VARIANCE_THRESHOLD))
 
         power = power_calc.solve_power(
             effect_size=effective_f,
@@ -677,6 +770,39 @@ def calculate_repeated_measures_power(n: int, effect_size: float, alpha: float,
         return None
 
 
+def _repeated_measures_power_array(n: int, effect_size: float, alpha: float,
+                                   num_measurements: int, correlation) -> Optional[np.ndarray]:
+    """
+    Array branch of calculate_repeated_measures_power(): one ANOVA power evaluation for
+    a whole vector of correlations, with out-of-range lanes set to NaN.
+    """
+    try:
+        correlation = np.asarray(correlation, dtype=float)
+        invalid = np.zeros(correlation.shape, dtype=bool)
+        for rule_invalid, _ in _repeated_measures_correlation_rules(correlation):
+            invalid = invalid | rule_invalid
+
+        if np.any((correlation >= 0.90) & ~invalid):
+            st.warning("⚠️ Very high correlations (≥ 0.90) may produce unreliable results. "
+                       "Consider using specialized software for exact calculations.")
+
+        correlation_capped = np.minimum(correlation, CORRELATION_STABILITY_CAP)
+        effective_f = effect_size / np.sqrt(np.maximum(1 - correlation_capped, MIN_VARIANCE_THRESHOLD))
+
+        power = FTestAnovaPower().solve_power(
+            effect_size=effective_f,
+            nobs=n * num_measurements,
+            alpha=alpha,
+            k_groups=num_measurements
+        )
+
+        return np.where(invalid, np.nan, np.clip(power, 0.0, 1.0))
+
+    except Exception as e:
+        st.error(f"Error in repeated measures power calculation: {e}")
+        return None
+
+
 def calculate_repeated_measures_n(effect_size: float, alpha: float, power: float,
                                   num_measurements: int, correlation: float) -> Optional[int]:
     """
@@ -734,19 +860,13 @@ def calculate_repeated_measures_n(effect_size: float, alpha: float, power: float
         # Cap correlation to prevent numerical instability
         # At high correlations, the adjustment formula becomes unstable
         correlation_capped = min(correlation, CORRELATION_STABILITY_CAP)
-        effective_f = effect_size / np.sqrt(max(1 - correlation_capped, MIN_VARIANCE_THRESHOLD))
-
-        # Use ANOVA power calculator
-        power_calc = FTestAnovaPower()
+        effective_f = effect_size / math.sqrt(max(1 - correlation_capped, MIN_VARIANCE_THRESHOLD))
 
-        # Solve for total observations
-        total_obs = power_calc.solve_power(
-            effect_size=effective_f,
-            nobs=None,
-            alpha=alpha,
-            power=power,
-            k_groups=num_measurements
-        )
+        # Solve for total observations with the ANOVA power calculator
+        total_obs = _solve_power_cached(FTestAnovaPower, (
+            ("alpha", alpha), ("effect_size", effective_f), ("k_groups", num_measurements),
+            ("nobs", None), ("power", power)
+        ))
 
         # Convert to number of subjects
         n_subjects = math.ceil(total_obs / num_measurements)
@@ -808,12 +928,12 @@ def calculate_assurance(n: int, alpha: float, prior_mean: float, prior_sd: float
         effect_sizes = np.abs(effect_sizes)
 
         powers = []
-        power_calc = TTestIndPower()
+        solve_power = TTestIndPower().solve_power
 
         for es in effect_sizes:
             if es > 0:
                 try:
-                    pwr = power_calc.solve_power(
+                    pwr = solve_power(
                         effect_size=es,
                         nobs1=n,
                         alpha=alpha,
@@ -926,12 +1046,12 @@ def calculate_expected_power(n: int, alpha: float, prior_mean: float, prior_sd:
         effect_sizes = np.abs(effect_sizes)
 
         powers = []
-        power_calc = TTestIndPower()
+        solve_power = TTestIndPower().solve_power
 
         for es in effect_sizes:
             if es > 0:
                 try:
-                    pwr = power_calc.solve_power(
+                    pwr = solve_power(
                         effect_size=es,
                         nobs1=n,
                         alpha=alpha,
@@ -1152,15 +1272,15 @@ def calculate_single_proportion_power(alpha: float, alternative: str, power: Opt
 
     try:
         alpha_crit = alpha / 2 if alternative == "two-sided" else alpha
-        z_alpha = norm.ppf(1 - alpha_crit)
+        z_alpha = ndtri(1 - alpha_crit)
 
         if power is None and nobs1 is not None:  # Calculate power
             if nobs1 <= 0:
                 st.error("Sample size must be positive.")
                 return None
 
-            se_alt = np.sqrt(sample_prop * (1 - sample_prop) / nobs1)
-            se_null = np.sqrt(null_prop * (1 - null_prop) / nobs1)
+            se_alt = math.sqrt(sample_prop * (1 - sample_prop) / nobs1)
+            se_null = math.sqrt(null_prop * (1 - null_prop) / nobs1)
 
             if se_alt == 0 or se_null == 0:
                 st.error("Standard error calculation failed.")
@@ -1171,11 +1291,11 @@ def calculate_single_proportion_power(alpha: float, alternative: str, power: Opt
                 crit_lower = null_prop - z_alpha * se_null
                 z_lower = (crit_lower - sample_prop) / se_alt
                 z_upper = (crit_upper - sample_prop) / se_alt
-                result = norm.cdf(z_lower) + (1 - norm.cdf(z_upper))
+                result = ndtr(z_lower) + ndtr(-z_upper)
             else:
                 crit = null_prop + (z_alpha if alternative == "larger" else -z_alpha) * se_null
                 z_crit = (crit - sample_prop) / se_alt
-                result = 1 - norm.cdf(z_crit) if alternative == "larger" else norm.cdf(z_crit)
+                result = ndtr(-z_crit) if alternative == "larger" else ndtr(z_crit)
 
             return max(0.0, min(1.0, result))
 
@@ -1184,8 +1304,8 @@ def calculate_single_proportion_power(alpha: float, alternative: str, power: Opt
                 st.error(f"Power must be between 0 and 1, got {power}")
                 return None
 
-            z_beta = norm.ppf(power)
-            num = z_alpha * np.sqrt(null_prop * (1 - null_prop)) + z_beta * np.sqrt(sample_prop * (1 - sample_prop))
+            z_beta = ndtri(power)
+            num = z_alpha * math.sqrt(null_prop * (1 - null_prop)) + z_beta * math.sqrt(sample_prop * (1 - sample_prop))
             den = abs(sample_prop - null_prop)
 
             if den == 0:
@@ -1202,147 +1322,216 @@ def calculate_single_proportion_power(alpha: float, alternative: str, power: Opt
     return None
 
 
-def calculate_logrank_power(alpha: float, alternative: str, power: Optional[float] = None,
-                            nobs1: Optional[float] = None, hazard_ratio: Optional[float] = None,
-                            prob_event: float = 0.5, ratio: float = 1.0, **kwargs) -> Optional[float]:
+def calculate_logrank_power_array(alpha, alternative, power=None, nobs1=None,
+                                  hazard_ratio=None, prob_event=0.5, ratio=1.0) -> np.ndarray:
     """
-    Calculate power or sample size for log-rank test using Schoenfeld's formula.
+    Vectorized Schoenfeld calculation for the log-rank test over parameter grids.
+
+    Array counterpart of calculate_logrank_power(). All arguments (including
+    `alternative`) may be scalars or array-likes; they are broadcast against each
+    other so a whole grid is evaluated with one call to the normal quantile and
+    CDF ufuncs (scipy.special.ndtri/ndtr) instead of one Python call per
+    parameter tuple.
+
+    No input validation or Streamlit messaging is done here - invalid lanes simply
+    produce NaN/inf. Use calculate_logrank_power() for validated scalar inputs.
 
     Parameters:
     -----------
-    alpha : float
+    alpha : float or array-like
         Significance level
-    alternative : str
+    alternative : str or array-like of str
         'two-sided', 'larger', or 'smaller'
-    power : float, optional
+    power : float or array-like, optional
         Desired statistical power (for sample size calculation)
-    nobs1 : float, optional
-        Sample size in group 1 (for power calculation)
-    hazard_ratio : float
-        Expected hazard ratio (HR); HR > 1 means worse survival in group 1
-    prob_event : float
+    nobs1 : float or array-like, optional
+        Sample size in group 1 (for power calculation); takes precedence over power
+    hazard_ratio : float or array-like
+        Expected hazard ratio (HR)
+    prob_event : float or array-like
         Probability of observing an event (default 0.5)
-    ratio : float
+    ratio : float or array-like
         Sample size ratio N2/N1 (default 1.0 for equal groups)
 
     Returns:
     --------
-    float : Calculated power or sample size (N1)
-
-    Notes:
-    ------
-    Based on Schoenfeld's formula for log-rank test sample size.
-    Calculates the required number of participants, accounting for event rate.
+    np.ndarray : Power (clipped to [0, 1]) if nobs1 is given, otherwise required N1
+                 (at least 1), with the broadcast shape of the inputs
     """
+    alt_code = np.vectorize(ALTERNATIVE_CODES.__getitem__, otypes=[int])(alternative)
+    alpha = np.asarray(alpha, dtype=float)
+    prob_event = np.asarray(prob_event, dtype=float)
+    ratio = np.asarray(ratio, dtype=float)
 
-    # Input validation
-    if hazard_ratio is None or hazard_ratio <= 0:
-        st.error("Hazard ratio must be positive.")
-        return None
+    # Critical values
+    two_sided = alt_code == 0
+    alpha_crit = np.where(two_sided, alpha / 2, alpha)
+    z_alpha = ndtri(1 - alpha_crit)
 
-    if hazard_ratio == 1:
-        st.error("Hazard ratio must be different from 1 (no effect).")
-        return None
+    # Log hazard ratio
+    theta = np.log(np.asarray(hazard_ratio, dtype=float))
 
-    if not (0 < prob_event <= 1):
-        st.error("Probability of event must be between 0 and 1.")
-        return None
+    if nobs1 is not None:  # Calculate power
+        nobs1 = np.asarray(nobs1, dtype=float)
+        n2 = nobs1 * ratio
+        n_total = nobs1 + n2
 
-    if ratio <= 0:
-        st.error("Sample size ratio must be positive.")
-        return None
+        # Expected number of events and proportion in each group
+        d = n_total * prob_event
+        p1 = nobs1 / n_total
+        p2 = n2 / n_total
 
-    try:
-        # Critical values
-        alpha_crit = alpha / 2 if alternative == "two-sided" else alpha
-        z_alpha = norm.ppf(1 - alpha_crit)
+        # Var(log HR estimate) = 1 / (d * p1 * p2), so 1/SE = sqrt(d * p1 * p2)
+        inv_se = np.sqrt(d * p1 * p2)
 
-        # Log hazard ratio
-        theta = np.log(hazard_ratio)
+        # Test statistic under alternative: z_obs ~ N(theta/SE, 1)
+        # Two-sided tests use |theta|; one-sided tests keep the sign of theta
+        z_obs = np.where(two_sided, np.abs(theta), theta) * inv_se
 
-        if power is None and nobs1 is not None:  # Calculate power
-            if nobs1 <= 0:
-                st.error("Sample size must be positive.")
-                return None
+        # Power = Φ(z_obs - z_alpha) + [two-sided] Φ(-z_obs - z_alpha)
+        # (Φ(x) rather than 1 - Φ(-x) avoids cancellation as power approaches 1)
+        result = ndtr(z_obs - z_alpha) + two_sided * ndtr(-z_alpha - z_obs)
+        return np.clip(result, 0.0, 1.0)
 
-            # Total sample size
-            n2 = nobs1 * ratio
-            n_total = nobs1 + n2
+    z_beta = ndtri(np.asarray(power, dtype=float))
 
-            # Expected number of events
-            d = n_total * prob_event
+    # Number of events needed (Schoenfeld's formula)
+    # For two groups with allocation ratio r = n2/n1:
+    # d = (z_alpha + z_beta)² × (1 + r) / (r × theta²)
+    # For equal allocation (r=1): d = 4 × (z_alpha + z_beta)² / theta²
+    # Reference: Schoenfeld, D. (1981). Biometrika, 68(1), 316-319
+    d_needed = ((z_alpha + z_beta) ** 2) * (1 + ratio) / (ratio * (theta ** 2))
 
-            # Check for sufficient expected events
-            if d < 1:
-                st.error(
-                    f"Expected number of events too small ({d:.2f} < 1). "
-                    f"Either increase sample size or increase probability of event."
-                )
-                return None
+    # Convert events to total sample size, then N1 = n_total / (1 + ratio)
+    n_total = d_needed / prob_event
+    n1 = n_total / (1 + ratio)
+
+    return np.maximum(1, n1)
 
-            # Proportion in each group
-            p1 = nobs1 / n_total
-            p2 = n2 / n_total
 
+def _logrank_validation_rules(power, nobs1, hazard_ratio, prob_event, ratio) -> tuple:
+    """
+    Input rules for calculate_logrank_power(), shared by its scalar and array paths.
+
+    Returns (rules, fields). `rules` is a list of (invalid, message) pairs in reporting
+    order, where `invalid` is a boolean broadcast against the inputs and `message` is a
+    str.format template over `fields`. Scalar inputs report the first violated rule;
+    array inputs set every lane that violates any rule to NaN.
+    """
+    hazard_ratio = np.asarray(hazard_ratio, dtype=float)
+    prob_event = np.asarray(prob_event, dtype=float)
+    ratio = np.asarray(ratio, dtype=float)
+    fields = {"power": power}
+
+    rules = [
+        (hazard_ratio <= 0, "Hazard ratio must be positive."),
+        (hazard_ratio == 1, "Hazard ratio must be different from 1 (no effect)."),
+        (~((prob_event > 0) & (prob_event <= 1)), "Probability of event must be between 0 and 1."),
+        (ratio <= 0, "Sample size ratio must be positive."),
+    ]
+
+    if nobs1 is not None:
+        nobs1 = np.asarray(nobs1, dtype=float)
+        n2 = nobs1 * ratio
+        n_total = nobs1 + n2
+        d = n_total * prob_event
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denominator = d * (nobs1 / n_total) * (n2 / n_total)
+        fields["d"] = d
+        rules += [
+            (nobs1 <= 0, "Sample size must be positive."),
+            # Check for sufficient expected events
+            (d < 1, "Expected number of events too small ({d:.2f} < 1). "
+                    "Either increase sample size or increase probability of event."),
             # Validate denominator for variance calculation
-            denominator = d * p1 * p2
-            if denominator <= 0 or not math.isfinite(denominator):
-                st.error("Invalid variance calculation: check sample sizes and group allocation.")
-                return None
+            ((denominator <= 0) | ~np.isfinite(denominator),
+             "Invalid variance calculation: check sample sizes and group allocation."),
+        ]
+    else:
+        power = np.asarray(power, dtype=float)
+        rules.append((~((power > 0) & (power < 1)), "Power must be between 0 and 1, got {power}"))
 
-            # Variance of log(HR) estimator
-            var_theta = 1 / denominator
+    return rules, fields
 
-            # Calculate power
-            # Test statistic under alternative: z_obs ~ N(theta/sqrt(var), 1)
-            z_obs = abs(theta) / np.sqrt(var_theta)
 
-            if alternative == "two-sided":
-                # Power = P(|Z| > z_alpha | theta != 0)
-                # = Φ(z_obs - z_alpha) + Φ(-z_obs - z_alpha)
-                result = 1 - norm.cdf(z_alpha - z_obs) + norm.cdf(-z_alpha - z_obs)
-            else:
-                # One-sided test
-                if alternative == "larger":
-                    # HR < 1, theta < 0
-                    z_obs = theta / np.sqrt(var_theta)  # Keep negative sign
-                    result = norm.cdf(z_obs - z_alpha)
-                else:
-                    # HR > 1, theta > 0
-                    z_obs = theta / np.sqrt(var_theta)
-                    result = 1 - norm.cdf(z_alpha - z_obs)
+def calculate_logrank_power(alpha: float, alternative: str, power: Optional[float] = None,
+                            nobs1: Optional[float] = None, hazard_ratio: Optional[float] = None,
+                            prob_event: float = 0.5, ratio: float = 1.0,
+                            **kwargs) -> Optional[Union[float, np.ndarray]]:
+    """
+    Calculate power or sample size for log-rank test using Schoenfeld's formula.
 
-            return max(0.0, min(1.0, result))
+    Parameters:
+    -----------
+    alpha : float or array-like
+        Significance level
+    alternative : str or array-like of str
+        'two-sided', 'larger', or 'smaller'
+    power : float or array-like, optional
+        Desired statistical power (for sample size calculation)
+    nobs1 : float or array-like, optional
+        Sample size in group 1 (for power calculation)
+    hazard_ratio : float or array-like
+        Expected hazard ratio (HR); HR > 1 means worse survival in group 1
+    prob_event : float or array-like
+        Probability of observing an event (default 0.5)
+    ratio : float or array-like
+        Sample size ratio N2/N1 (default 1.0 for equal groups)
 
-        elif nobs1 is None and power is not None:  # Calculate N
-            if not 0 < power < 1:
-                st.error(f"Power must be between 0 and 1, got {power}")
-                return None
+    Returns:
+    --------
+    float : Calculated power or sample size (N1)
+    np.ndarray : If any argument (alpha and alternative included) is an array;
+                 lanes with invalid inputs are NaN instead of raising a Streamlit error
 
-            z_beta = norm.ppf(power)
+    Notes:
+    ------
+    Based on Schoenfeld's formula for log-rank test sample size.
+    Calculates the required number of participants, accounting for event rate.
+    Inputs are checked against _logrank_validation_rules() and then evaluated by
+    calculate_logrank_power_array(); both steps are shared by the scalar and array paths.
+
+    Examples:
+    ---------
+    >>> calculate_logrank_power(0.05, "two-sided", nobs1=100, hazard_ratio=[0.5, 2.0], prob_event=0.6)
+    array([0.9668..., 0.9668...])
+    """
+    if hazard_ratio is None:
+        st.error("Hazard ratio must be positive.")
+        return None
 
-            # Number of events needed (Schoenfeld's formula)
-            # For two groups with allocation ratio r = n2/n1:
-            # d = (z_alpha + z_beta)² × (1 + r) / (r × theta²)
-            # For equal allocation (r=1): d = 4 × (z_alpha + z_beta)² / theta²
-            # Reference: Schoenfeld, D. (1981). Biometrika, 68(1), 316-319
-            d_needed = ((z_alpha + z_beta) ** 2) * (1 + ratio) / (ratio * (theta ** 2))
+    if (power is None) == (nobs1 is None):
+        return None
 
-            # Convert events to total sample size
-            n_total = d_needed / prob_event
+    is_array = any(np.ndim(v) > 0 for v in (alpha, alternative, power, nobs1, hazard_ratio,
+                                            prob_event, ratio))
 
-            # Calculate N1 from total N and ratio
-            # n_total = n1 + n2 = n1 + n1*ratio = n1(1 + ratio)
-            n1 = n_total / (1 + ratio)
+    try:
+        rules, fields = _logrank_validation_rules(power, nobs1, hazard_ratio, prob_event, ratio)
+
+        if not is_array:
+            for invalid, message in rules:
+                if invalid:
+                    st.error(message.format(**fields))
+                    return None
 
-            return max(1, n1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = calculate_logrank_power_array(alpha, alternative, power=power, nobs1=nobs1,
+                                                   hazard_ratio=hazard_ratio,
+                                                   prob_event=prob_event, ratio=ratio)
+
+        if not is_array:
+            return float(result)
+
+        invalid_lanes = np.zeros(np.shape(result), dtype=bool)
+        for invalid, _ in rules:
+            invalid_lanes = invalid_lanes | invalid
+        return np.where(invalid_lanes, np.nan, result)
 
     except Exception as e:
         st.error(f"Calculation error in log-rank test: {str(e)}")
         return None
 
-    return None
-
 
 # ==============================================================================
 #                           MAIN CALCULATION ENGINE
@@ -1911,7 +2100,7 @@ def perform_calculation(config: Dict, inputs: Dict) -> Optional[float]:
     are_factor = ARE_FACTORS.get(config.get("are"))
     if are_factor is not None and are_factor > 0:
         if goal in ["Power", "MDES"] and effect is not None:
-            effect *= np.sqrt(are_factor)
+            effect *= math.sqrt(are_factor)
     elif config.get("are"):
         # ARE adjustment requested but factor not found or invalid
         st.error(f"Invalid ARE adjustment factor for {config.get('are')}")
@@ -1920,7 +2109,6 @@ def perform_calculation(config: Dict, inputs: Dict) -> Optional[float]:
     # Prepare calculation arguments
     try:
         if config.get("class"):  # Statsmodels class
-            calc_class = config["class"]()
             args = {
                 "effect_size": effect if goal != "MDES" else None,
                 "alpha": alpha,
@@ -1941,7 +2129,7 @@ def perform_calculation(config: Dict, inputs: Dict) -> Optional[float]:
                     v is not None or (goal == "Sample Size" and k in ["nobs", "nobs1"]) or (
                             goal == "Power" and k == "power") or (goal == "MDES" and k == "effect_size")}
 
-            result = calc_class.solve_power(**args)
+            result = _solve_power_cached(config["class"], tuple(sorted(args.items())))
 
         elif config.get("func"):  # Direct function
             func_name = config["func"]
@@ -2078,7 +2266,7 @@ def perform_calculation(config: Dict, inputs: Dict) -> Optional[float]:
                 # For non-parametric tests: MDES_np = MDES_p / sqrt(ARE)
                 # But since we multiplied effect by sqrt(ARE) in line 1768,
                 # we need to divide result by sqrt(ARE) to get correct MDES
-                result /= np.sqrt(are_factor)
+                result /= math.sqrt(are_factor)
 
         if config.get("fisher"):
             if goal == "Sample Size":
@@ -2234,9 +2422,9 @@ def display_results(config: Dict, inputs: Dict, result: float):
     st.subheader("Calculated Result:")
 
     if goal == "Sample Size":
-        n1 = int(np.ceil(result))
+        n1 = int(math.ceil(result))
         n_ratio = inputs.get("n_ratio", 1.0)
-        n2 = int(np.ceil(n1 * n_ratio)) if config.get("n_ratio") else None
+        n2 = int(math.ceil(n1 * n_ratio)) if config.get("n_ratio") else None
         k = inputs.get("k_groups", 1 if not n2 else 2)
         total = n1 * k if not n2 else n1 + n2
 
@@ -2259,8 +2447,8 @@ def display_results(config: Dict, inputs: Dict, result: float):
             else:
                 st.markdown("---")
                 st.subheader(f"Adjusted for {dropout}% Dropout:")
-                n1_adj = int(np.ceil(n1 / (1 - dropout / 100)))
-                n2_adj = int(np.ceil(n1_adj * n_ratio)) if n2 else None
+                n1_adj = int(math.ceil(n1 / (1 - dropout / 100)))
+                n2_adj = int(math.ceil(n1_adj * n_ratio)) if n2 else None
                 total_adj = n1_adj * k if not n2 else n1_adj + (n2_adj or 0)
 
                 adj_vals = [n1_adj]